@@ -0,0 +1,467 @@
+"""
+Shared ADCP backend client
+One connection pool, retry policy and set of caches for every MCP server
+in this repo (server.py and main.py), plus the tool bodies they share.
+"""
+
+import asyncio
+import atexit
+import functools
+import hashlib
+import httpx
+import msgspec
+import orjson
+import time
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict
+
+BASE_URL = "http://localhost:8000"
+REDIS_URL = "redis://localhost:6379/0"
+
+# Backend routes, relative to BASE_URL
+PATHS = {
+    "products": "/api/v1/adcp/products",
+    "media_buy": "/api/v1/adcp/media-buy",
+    "signals_discover": "/api/v1/adcp/signals/discover",
+    "signals_activate": "/api/v1/adcp/signals/activate",
+    "creatives_sync": "/api/v1/adcp/creatives/sync",
+    "properties": "/api/v1/adcp/properties",
+    "channels": "/api/v1/channels",
+    "programs": "/api/v1/programs",
+    "adbreaks": "/api/v1/adbreaks",
+    "inventory": "/api/v1/inventory",
+    "book_ad": "/api/v1/book_ad",
+}
+
+_JSON_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+# Retry policy for transient backend failures (connection errors, 429, 5xx).
+# Non-idempotent methods are only retried when the request provably never
+# reached the backend (connection failures) or was explicitly refused.
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.25
+_RETRY_MAX_DELAY = 5.0
+_RETRY_DEADLINE = 30.0
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_UNSAFE_RETRY_STATUSES = frozenset({429, 503})
+_UNSAFE_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# Large catalog responses are capped at this many items before reaching the agent
+_CAP_LIMIT = 200
+
+# Backend bodies larger than this are refused instead of being buffered whole
+_MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Shared async client: tool calls await the backend instead of blocking the
+# event loop, and concurrent calls share one keep-alive connection pool.
+# HTTP/2 is negotiated via ALPN when BASE_URL is https, multiplexing
+# concurrent calls over one connection; plain http stays on HTTP/1.1.
+# Built on first use so that starting a server never pays for h2 unless a
+# backend-bound tool is actually called.
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(
+            base_url=BASE_URL,
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=15.0,
+        )
+        _register_shutdown()
+    return _CLIENT
+
+
+# Separate client for get_api_data: arbitrary user-supplied URLs must not
+# resolve against BASE_URL or share the backend's pool
+_API_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_api_client() -> httpx.AsyncClient:
+    global _API_CLIENT
+    if _API_CLIENT is None:
+        _API_CLIENT = httpx.AsyncClient(follow_redirects=True, timeout=10.0)
+        _register_shutdown()
+    return _API_CLIENT
+
+
+_SHUTDOWN_REGISTERED = False
+
+
+def _register_shutdown() -> None:
+    global _SHUTDOWN_REGISTERED
+    if not _SHUTDOWN_REGISTERED:
+        atexit.register(_close_clients)
+        _SHUTDOWN_REGISTERED = True
+
+
+def _close_clients() -> None:
+    async def close():
+        for client in (_CLIENT, _API_CLIENT, _REDIS):
+            if client is not None:
+                await client.aclose()
+
+    try:
+        asyncio.run(close())
+    except RuntimeError:
+        # Pooled connections may belong to an event loop that is already
+        # closed; the process exit releases them anyway.
+        pass
+
+
+# In-process caches for slowly-changing catalog data, tiered by volatility
+_CHANNELS_CACHE = TTLCache(maxsize=8, ttl=300)
+_EPG_CACHE = TTLCache(maxsize=256, ttl=60)
+_ADBREAKS_CACHE = TTLCache(maxsize=8, ttl=10)
+
+
+def _is_cacheable(result) -> bool:
+    """False for error payloads and stale fallbacks, which must not be pinned"""
+    if not isinstance(result, dict):
+        return True
+    return "error" not in result and result.get("status") != "failed" and not result.get("stale")
+
+
+def ttl_cached(cache: TTLCache):
+    """
+    Serve repeated tool calls from `cache`; only successful responses are stored.
+    Concurrent misses for the same key share a single in-flight backend call.
+    """
+    def decorator(fn):
+        inflight: Dict[tuple, asyncio.Task] = {}
+
+        async def fill(key, args, kwargs):
+            try:
+                result = await fn(*args, **kwargs)
+                if _is_cacheable(result):
+                    cache[key] = result
+                return result
+            finally:
+                del inflight[key]
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = hashkey(*args, **kwargs)
+            if key in cache:
+                return cache[key]
+            task = inflight.get(key)
+            if task is None:
+                task = inflight[key] = asyncio.ensure_future(fill(key, args, kwargs))
+            # Shielded so a cancelled caller does not cancel the shared call
+            return await asyncio.shield(task)
+        return wrapper
+    return decorator
+
+
+# Shared response cache: fresh entries skip the backend, stale entries are
+# served when the backend is down. Redis being unavailable is a cache miss.
+# Like the HTTP client, the connection is set up on first use.
+_REDIS = None
+_FRESH_TTL = 60
+_STALE_TTL = 3600
+
+
+def _get_redis():
+    global _REDIS
+    if _REDIS is None:
+        import redis.asyncio as redis
+
+        _REDIS = redis.Redis.from_url(
+            REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+        )
+        _register_shutdown()
+    return _REDIS
+
+
+def _response_key(method: str, path: str, payload, params) -> str:
+    request = orjson.dumps([method, path, payload, params], option=orjson.OPT_SORT_KEYS)
+    return "adcp:" + hashlib.blake2b(request).hexdigest()
+
+
+async def _redis_load(key: str):
+    from redis.exceptions import RedisError
+
+    try:
+        cached = await _get_redis().get(key)
+    except RedisError:
+        return None
+    return orjson.loads(cached) if cached else None
+
+
+async def _redis_store(key: str, body) -> None:
+    from redis.exceptions import RedisError
+
+    data = orjson.dumps(body)
+    try:
+        async with _get_redis().pipeline(transaction=False) as pipe:
+            pipe.setex(key, _FRESH_TTL, data)
+            pipe.setex(f"{key}:stale", _STALE_TTL, data)
+            await pipe.execute()
+    except RedisError:
+        pass
+
+
+def _encode(payload) -> bytes:
+    """Serialize a request body; Structs are encoded by msgspec without a dict detour"""
+    if isinstance(payload, msgspec.Struct):
+        return msgspec.json.encode(payload)
+    return orjson.dumps(payload)
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Exponential backoff, deferring to a numeric Retry-After header (capped) when sent"""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), _RETRY_MAX_DELAY)
+    return _RETRY_BACKOFF * 2 ** attempt
+
+
+def _cap_list(body, key: str, limit: int):
+    """Truncate the top-level `key` array of `body` to `limit` items, flagging the cut"""
+    if isinstance(body, dict):
+        items = body.get(key)
+        if isinstance(items, list) and len(items) > limit:
+            body[key] = items[:limit]
+            body["truncated"] = True
+    return body
+
+
+async def _read_capped(response: httpx.Response, limit: int) -> bytes:
+    """Read a streamed body, giving up as soon as it exceeds `limit` bytes"""
+    too_large = ValueError(f"response body over {limit} bytes")
+    declared = response.headers.get("Content-Length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    content = bytearray()
+    async for chunk in response.aiter_bytes():
+        content += chunk
+        if len(content) > limit:
+            raise too_large
+    return bytes(content)
+
+
+async def _send(
+    method: str,
+    path: str,
+    payload,
+    params: Optional[Dict],
+    timeout: float,
+    cap_list: Optional[str] = None
+):
+    """
+    One backend request; raises on transport errors and non-2xx statuses.
+    Connection failures and transient statuses are retried with backoff so
+    short backend blips never reach the agent; POSTs are only retried when
+    the backend cannot have acted on them. All attempts together stay within
+    _RETRY_DEADLINE seconds. Bodies over _MAX_BODY_BYTES are refused while
+    streaming. With `cap_list`, that top-level array of the body is capped
+    at _CAP_LIMIT items.
+    """
+    kwargs = {"params": params, "timeout": timeout}
+    if payload is not None:
+        kwargs["content"] = _encode(payload)
+        kwargs["headers"] = _JSON_HEADERS
+
+    if method.upper() in _IDEMPOTENT_METHODS:
+        retry_errors, retry_statuses = httpx.TransportError, _RETRY_STATUSES
+    else:
+        retry_errors, retry_statuses = _UNSAFE_RETRY_ERRORS, _UNSAFE_RETRY_STATUSES
+
+    client = _get_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _RETRY_DEADLINE
+    for attempt in range(_RETRY_TOTAL + 1):
+        # Retries share one overall budget rather than each getting `timeout`
+        kwargs["timeout"] = min(timeout, deadline - loop.time())
+        try:
+            request = client.build_request(method, path, **kwargs)
+            response = await client.send(request, stream=True)
+        except retry_errors:
+            delay = _retry_delay(attempt)
+            if attempt == _RETRY_TOTAL or loop.time() + delay >= deadline:
+                raise
+        else:
+            if response.status_code not in retry_statuses:
+                break
+            delay = _retry_delay(attempt, response)
+            if attempt == _RETRY_TOTAL or loop.time() + delay >= deadline:
+                break
+            await response.aclose()
+        await asyncio.sleep(delay)
+
+    try:
+        response.raise_for_status()
+        content = await _read_capped(response, _MAX_BODY_BYTES)
+    finally:
+        await response.aclose()
+    body = orjson.loads(content)
+    if cap_list is not None:
+        body = _cap_list(body, cap_list, _CAP_LIMIT)
+    return body
+
+
+async def _fetch_with_stale_fallback(
+    method: str,
+    path: str,
+    payload,
+    params: Optional[Dict],
+    timeout: float,
+    cap_list: Optional[str] = None
+):
+    """
+    Call the backend through the Redis response cache.
+    Serves a fresh cached body when present; if the backend is unreachable or
+    answers 5xx, falls back to the last good body flagged with cached/stale,
+    or re-raises.
+    """
+    key = _response_key(method, path, payload, params)
+    cached = await _redis_load(key)
+    if cached is not None:
+        return cached
+
+    try:
+        body = await _send(method, path, payload, params, timeout, cap_list)
+    except (httpx.TransportError, httpx.HTTPStatusError) as e:
+        # Only outages fall back; a 4xx is the backend's answer and must surface
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+            raise
+        stale = await _redis_load(f"{key}:stale")
+        if stale is None:
+            raise
+        if not isinstance(stale, dict):
+            stale = {"data": stale}
+        return {**stale, "cached": True, "stale": True}
+
+    await _redis_store(key, body)
+    return body
+
+
+def _failure_reason(exc: Exception, backend: bool = True) -> str:
+    """
+    Short, stable description of a failed request. The common outage cases
+    get fixed strings, which the agent can match on and which skip
+    stringifying the exception chain. With `backend` False the wording does
+    not blame the ADCP backend, for requests to arbitrary hosts.
+    """
+    if isinstance(exc, httpx.TimeoutException):
+        return "backend timeout" if backend else "request timeout"
+    if isinstance(exc, httpx.ConnectError):
+        return "backend unreachable" if backend else "host unreachable"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"status {exc.response.status_code}"
+    return str(exc)
+
+
+async def call_backend(
+    method: str,
+    path: str,
+    *,
+    json=None,
+    params: Optional[Dict] = None,
+    timeout: float = 15,
+    error: Optional[str] = None,
+    stale_cache: bool = False,
+    cap_list: Optional[str] = None
+):
+    """
+    Call a backend endpoint and return its decoded JSON body.
+    Never raises: failures come back as an ADCP failed-status payload whose
+    message starts with `error`, or as a legacy {"error": ...} dict when
+    `error` is None. `stale_cache` routes the call through Redis, and
+    `cap_list` names a top-level array to cap at _CAP_LIMIT items.
+    """
+    try:
+        if stale_cache:
+            return await _fetch_with_stale_fallback(method, path, json, params, timeout, cap_list)
+        return await _send(method, path, json, params, timeout, cap_list)
+    except Exception as e:
+        reason = _failure_reason(e)
+        if error is None:
+            return {"error": reason}
+        return {
+            "protocol": "adcp",
+            "version": "2.3.0",
+            "status": "failed",
+            "message": f"{error}: {reason}"
+        }
+
+
+# Today's ISO date, recomputed only once the local day rolls over
+_TODAY_CACHE = [0.0, ""]
+
+
+def today_iso() -> str:
+    now = time.time()
+    if now >= _TODAY_CACHE[0]:
+        today = date.today()
+        _TODAY_CACHE[0] = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        _TODAY_CACHE[1] = today.isoformat()
+    return _TODAY_CACHE[1]
+
+
+# ==============================================
+# Shared Tool Implementations
+# ==============================================
+
+@ttl_cached(_CHANNELS_CACHE)
+async def get_channels_impl() -> dict:
+    """Fetch the channels list"""
+    return await call_backend("GET", PATHS["channels"], timeout=10)
+
+
+@ttl_cached(_EPG_CACHE)
+async def _fetch_epg_shows(channel: str, query_date: str) -> dict:
+    params = {"channel": channel, "date": query_date}
+    
+    return await call_backend("GET", PATHS["programs"], params=params, timeout=10)
+
+
+async def get_epg_shows_impl(channel: str, query_date: Optional[str] = None) -> dict:
+    """Fetch the EPG program schedule of `channel`, defaulting to today"""
+    # Resolved before the cache lookup, so a cached "today" ends at midnight
+    return await _fetch_epg_shows(channel, query_date or today_iso())
+
+
+@ttl_cached(_ADBREAKS_CACHE)
+async def get_adbreaks_impl(available=None) -> dict:
+    """Fetch ad breaks, optionally filtered on availability"""
+    params = {}
+    if available is not None:
+        params["available"] = available
+    
+    return await call_backend("GET", PATHS["adbreaks"], params=params, timeout=10)
+
+
+async def get_api_data_impl(
+    url: str,
+    method: str = "GET",
+    headers: Optional[Dict] = None,
+    params: Optional[Dict] = None,
+    body: Optional[Dict] = None
+) -> dict:
+    """Call an arbitrary HTTP endpoint, falling back to raw text for non-JSON bodies"""
+    try:
+        response = await _get_api_client().request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            json=body,
+            timeout=10
+        )
+        response.raise_for_status()
+        try:
+            return orjson.loads(response.content)
+        except ValueError:
+            return {"text": response.text}
+    except Exception as e:
+        return {"error": _failure_reason(e, backend=False)}
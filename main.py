@@ -6,64 +6,40 @@ cd to the `examples/snippets/clients` directory and run:
 """
 
 from mcp.server.fastmcp import FastMCP
-import requests
-from datetime import date
+
+from adcp_client import (
+    get_adbreaks_impl,
+    get_api_data_impl,
+    get_channels_impl,
+    get_epg_shows_impl,
+)
 
 # Create an MCP server
 mcp = FastMCP("Demo")
 
 @mcp.tool("get_epg_shows", description="Fetch today's EPG shows for a given channel")
-def get_epg_shows(channel: str, query_date: str = None) -> dict:
+async def get_epg_shows(channel: str, query_date: str = None) -> dict:
     """
     Fetch EPG schedule from the backend API.
     Args:
         channel (str): Channel name (e.g., "al_aoula")
         query_date (str): Date in YYYY-MM-DD format, defaults to today
     """
-    if not query_date:
-        query_date = str(date.today())
-
-    url = "http://localhost:8000/api/v1/programs"
-    params = {"channel": channel, "date": query_date}
-
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_epg_shows_impl(channel, query_date)
     
 @mcp.tool("get_solded_adbreaks", description="Fetch Solded adbreaks for a given channel and date")
-def get_solded_adbreaks(available:str) -> dict:
-    
-
-    url = "http://localhost:8000/api/v1/adbreaks"
-    params = {"available": available}
-
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+async def get_solded_adbreaks(available:str) -> dict:
+    return await get_adbreaks_impl(available)
     
 # Add an addition tool
 @mcp.tool("get_channels", description="Fetch channels list from the backend API")
-def get_channels() -> dict:
+async def get_channels() -> dict:
     """Add two numbers"""
-    url = "http://localhost:8000/api/v1/channels"
-    # params = {"channel": channel, "date": query_date}
-
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_channels_impl()
     
 
 @mcp.tool("get_api_data", description="Fetch JSON data from a public or internal API")
-def get_api_data(
+async def get_api_data(
     url: str,
     method: str = "GET",
     headers: dict = None,
@@ -79,22 +55,7 @@ def get_api_data(
         params (dict): Optional query parameters.
         body (dict): Optional body for POST requests.
     """
-    try:
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=body,
-            timeout=10
-        )
-        response.raise_for_status()
-        try:
-            return response.json()
-        except ValueError:
-            return {"text": response.text}
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_api_data_impl(url, method, headers, params, body)
 
 
 # Add a dynamic greeting resource
@@ -6,14 +6,53 @@ Run with: uv run server fastmcp_quickstart stdio
 """
 
 from mcp.server.fastmcp import FastMCP
-import requests
-from datetime import date, datetime
+import asyncio
+import msgspec
+from cachetools import TTLCache
 from typing import Optional, List, Dict
 
+from adcp_client import (
+    PATHS,
+    call_backend,
+    get_adbreaks_impl,
+    get_api_data_impl,
+    get_channels_impl,
+    get_epg_shows_impl,
+    today_iso,
+    ttl_cached,
+)
+
 # Create an MCP server
 mcp = FastMCP("ADCP TV Ad Server")
 
-BASE_URL = "http://localhost:8000"
+# Payload defaults, built once instead of on every call
+_DEFAULT_OBJECTIVES = ["reach", "awareness"]
+_DEFAULT_SIGNAL_TYPES = ["audience", "contextual"]
+
+# Property catalog changes rarely; same tier as the channels cache
+_PROPERTIES_CACHE = TTLCache(maxsize=128, ttl=300)
+
+# ==============================================
+# ADCP Payloads
+# ==============================================
+
+class Package(msgspec.Struct):
+    """Ad break purchased as part of a media buy"""
+    package_id: str
+
+
+class MediaBuyRequest(msgspec.Struct):
+    """Body of POST /api/v1/adcp/media-buy"""
+    name: str
+    advertiser: str
+    packages: List[Package]
+    start_date: str
+    end_date: str
+    budget: float
+    currency: str
+    objectives: List[str]
+    kpis: Dict = {}
+
 
 # ==============================================
 # ADCP Media Buy Protocol
@@ -23,7 +62,7 @@ BASE_URL = "http://localhost:8000"
     "get_products",
     description="🎯 ADCP: Discover media inventory using natural language. Example: 'Find premium video spots during sports programs next week under 50,000 MAD'"
 )
-def get_products(
+async def get_products(
     query: str,
     channel: Optional[str] = None,
     date_from: Optional[str] = None,
@@ -44,36 +83,31 @@ def get_products(
     Returns:
         ADCP-compliant product catalog with availability and pricing
     """
-    url = f"{BASE_URL}/api/v1/adcp/products"
-    
     payload = {
         "query": query,
         "channel": channel,
-        "date_from": date_from or str(date.today()),
+        "date_from": date_from or today_iso(),
         "date_to": date_to,
         "filters": {
             "max_budget": max_budget
         }
     }
     
-    try:
-        response = requests.post(url, json=payload, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Product discovery error: {str(e)}"
-        }
+    return await call_backend(
+        "POST",
+        PATHS["products"],
+        json=payload,
+        error="Product discovery error",
+        stale_cache=True,
+        cap_list="products"
+    )
 
 
 @mcp.tool(
     "create_media_buy",
     description="📺 ADCP: Create a new TV advertising campaign by purchasing ad spots"
 )
-def create_media_buy(
+async def create_media_buy(
     name: str,
     advertiser: str,
     package_ids: List[str],
@@ -100,38 +134,30 @@ def create_media_buy(
     Returns:
         ADCP MediaBuy object with campaign ID and confirmation
     """
-    url = f"{BASE_URL}/api/v1/adcp/media-buy"
-    
-    payload = {
-        "name": name,
-        "advertiser": advertiser,
-        "packages": [{"package_id": pid} for pid in package_ids],
-        "start_date": start_date,
-        "end_date": end_date,
-        "budget": budget,
-        "currency": currency,
-        "objectives": objectives or ["reach", "awareness"],
-        "kpis": {}
-    }
-    
-    try:
-        response = requests.post(url, json=payload, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Media buy creation error: {str(e)}"
-        }
+    payload = MediaBuyRequest(
+        name=name,
+        advertiser=advertiser,
+        packages=[Package(pid) for pid in package_ids],
+        start_date=start_date,
+        end_date=end_date,
+        budget=budget,
+        currency=currency,
+        objectives=objectives or _DEFAULT_OBJECTIVES
+    )
+    
+    return await call_backend(
+        "POST",
+        PATHS["media_buy"],
+        json=payload,
+        error="Media buy creation error"
+    )
 
 
 @mcp.tool(
     "get_media_buy_delivery",
     description="📊 ADCP: Get real-time campaign performance and delivery metrics"
 )
-def get_media_buy_delivery(media_buy_id: str) -> dict:
+async def get_media_buy_delivery(media_buy_id: str) -> dict:
     """
     ADCP Task: get_media_buy_delivery
     Monitor campaign performance in real-time.
@@ -142,19 +168,13 @@ def get_media_buy_delivery(media_buy_id: str) -> dict:
     Returns:
         Real-time delivery metrics including spots delivered, budget spent, completion rate
     """
-    url = f"{BASE_URL}/api/v1/adcp/media-buy/{media_buy_id}/delivery"
-    
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Delivery data error: {str(e)}"
-        }
+    return await call_backend(
+        "GET",
+        f"{PATHS['media_buy']}/{media_buy_id}/delivery",
+        timeout=10,
+        error="Delivery data error",
+        stale_cache=True
+    )
 
 
 # ==============================================
@@ -165,7 +185,7 @@ def get_media_buy_delivery(media_buy_id: str) -> dict:
     "discover_signals",
     description="🎯 ADCP: Discover audience and contextual signals using natural language. Example: 'Find sports enthusiasts aged 25-45 in Casablanca'"
 )
-def discover_signals(
+async def discover_signals(
     query: str,
     signal_types: Optional[List[str]] = None,
     min_scale: Optional[int] = None
@@ -182,35 +202,30 @@ def discover_signals(
     Returns:
         Matching signals with demographics and activation options
     """
-    url = f"{BASE_URL}/api/v1/adcp/signals/discover"
-    
     payload = {
         "query": query,
-        "signal_types": signal_types or ["audience", "contextual"],
+        "signal_types": signal_types or _DEFAULT_SIGNAL_TYPES,
         "providers": None,
         "filters": {
             "min_scale": min_scale
         }
     }
     
-    try:
-        response = requests.post(url, json=payload, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Signal discovery error: {str(e)}"
-        }
+    return await call_backend(
+        "POST",
+        PATHS["signals_discover"],
+        json=payload,
+        error="Signal discovery error",
+        stale_cache=True,
+        cap_list="signals"
+    )
 
 
 @mcp.tool(
     "activate_signal",
     description="🚀 ADCP: Activate audience signals on decisioning platforms"
 )
-def activate_signal(
+async def activate_signal(
     signal_id: str,
     platform_ids: List[str],
     config: Optional[Dict] = None
@@ -227,25 +242,18 @@ def activate_signal(
     Returns:
         Activation status and sync confirmation
     """
-    url = f"{BASE_URL}/api/v1/adcp/signals/activate"
-    
     payload = {
         "signal_id": signal_id,
         "platforms": [{"platform_id": pid} for pid in platform_ids],
         "config": config or {}
     }
     
-    try:
-        response = requests.post(url, json=payload, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Signal activation error: {str(e)}"
-        }
+    return await call_backend(
+        "POST",
+        PATHS["signals_activate"],
+        json=payload,
+        error="Signal activation error"
+    )
 
 
 # ==============================================
@@ -256,7 +264,7 @@ def activate_signal(
     "sync_creatives",
     description="🎬 ADCP: Upload and assign creative assets (videos, images) to campaigns"
 )
-def sync_creatives(
+async def sync_creatives(
     media_buy_id: str,
     creative_urls: List[str],
     assignments: Optional[Dict] = None
@@ -273,25 +281,18 @@ def sync_creatives(
     Returns:
         Upload status and creative IDs
     """
-    url = f"{BASE_URL}/api/v1/adcp/creatives/sync"
-    
     payload = {
         "media_buy_id": media_buy_id,
         "creatives": [{"url": url} for url in creative_urls],
         "assignments": assignments or {}
     }
     
-    try:
-        response = requests.post(url, json=payload, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Creative sync error: {str(e)}"
-        }
+    return await call_backend(
+        "POST",
+        PATHS["creatives_sync"],
+        json=payload,
+        error="Creative sync error"
+    )
 
 
 # ==============================================
@@ -302,7 +303,8 @@ def sync_creatives(
     "get_properties",
     description="📡 ADCP: Get TV channel/property catalog (AdCP v2.3.0)"
 )
-def get_properties(
+@ttl_cached(_PROPERTIES_CACHE)
+async def get_properties(
     publisher_domain: Optional[str] = None,
     tags: Optional[str] = None
 ) -> dict:
@@ -316,24 +318,20 @@ def get_properties(
     Returns:
         TV channel/property definitions with metadata
     """
-    url = f"{BASE_URL}/api/v1/adcp/properties"
     params = {}
     if publisher_domain:
         params["publisher_domain"] = publisher_domain
     if tags:
         params["tags"] = tags
     
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {
-            "protocol": "adcp",
-            "version": "2.3.0",
-            "status": "failed",
-            "message": f"Property discovery error: {str(e)}"
-        }
+    return await call_backend(
+        "GET",
+        PATHS["properties"],
+        params=params,
+        timeout=10,
+        error="Property discovery error",
+        stale_cache=True
+    )
 
 
 # ==============================================
@@ -344,67 +342,39 @@ def get_properties(
     "get_channels",
     description="[LEGACY] Get channels list - prefer get_properties for ADCP compliance"
 )
-def get_channels() -> dict:
+async def get_channels() -> dict:
     """Legacy: Fetch channels list"""
-    url = f"{BASE_URL}/api/v1/channels"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_channels_impl()
 
 
 @mcp.tool(
     "get_epg_shows",
     description="[LEGACY] Fetch EPG schedule - prefer get_products for ADCP compliance"
 )
-def get_epg_shows(channel: str, query_date: Optional[str] = None) -> dict:
+async def get_epg_shows(channel: str, query_date: Optional[str] = None) -> dict:
     """Legacy: Fetch EPG program schedule"""
-    if not query_date:
-        query_date = str(date.today())
-    
-    url = f"{BASE_URL}/api/v1/programs"
-    params = {"channel": channel, "date": query_date}
-    
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_epg_shows_impl(channel, query_date)
 
 
 @mcp.tool(
     "get_adbreaks",
     description="[LEGACY] Fetch ad breaks - prefer get_products for ADCP compliance"
 )
-def get_adbreaks(available: Optional[bool] = None) -> dict:
+async def get_adbreaks(available: Optional[bool] = None) -> dict:
     """Legacy: Fetch ad breaks with availability filter"""
-    url = f"{BASE_URL}/api/v1/adbreaks"
-    params = {}
-    if available is not None:
-        params["available"] = available
-    
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_adbreaks_impl(available)
 
 
 @mcp.tool(
     "get_inventory",
     description="[LEGACY] Get inventory with audience data"
 )
-def get_inventory(
+async def get_inventory(
     channel: str,
     query_date: str,
     region: Optional[str] = None
 ) -> dict:
     """Legacy: Get detailed inventory with pricing and audience"""
-    url = f"{BASE_URL}/api/v1/inventory"
     params = {
         "channel": channel,
         "date": query_date
@@ -412,28 +382,21 @@ def get_inventory(
     if region:
         params["region"] = region
     
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await call_backend("GET", PATHS["inventory"], params=params, timeout=10)
 
 
 @mcp.tool(
     "book_ad",
     description="[LEGACY] Book an ad spot - prefer create_media_buy for ADCP compliance"
 )
-def book_ad(inventory_id: str) -> dict:
+async def book_ad(inventory_id: str) -> dict:
     """Legacy: Mark a single ad break as sold"""
-    url = f"{BASE_URL}/api/v1/book_ad"
-    
-    try:
-        response = requests.post(url, json={"inventory_id": inventory_id}, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return await call_backend(
+        "POST",
+        PATHS["book_ad"],
+        json={"inventory_id": inventory_id},
+        timeout=10
+    )
 
 
 # ==============================================
@@ -444,7 +407,7 @@ def book_ad(inventory_id: str) -> dict:
     "get_api_data",
     description="Generic HTTP API caller for non-ADCP endpoints"
 )
-def get_api_data(
+async def get_api_data(
     url: str,
     method: str = "GET",
     headers: Optional[Dict] = None,
@@ -455,22 +418,71 @@ def get_api_data(
     Generic API endpoint caller.
     Use ADCP-specific tools when possible for better standardization.
     """
-    try:
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=body,
-            timeout=10
-        )
-        response.raise_for_status()
-        try:
-            return response.json()
-        except ValueError:
-            return {"text": response.text}
-    except Exception as e:
-        return {"error": str(e)}
+    return await get_api_data_impl(url, method, headers, params, body)
+
+
+# ==============================================
+# Batch Execution
+# ==============================================
+
+_BATCH_TOOLS = frozenset({
+    "get_products",
+    "create_media_buy",
+    "get_media_buy_delivery",
+    "discover_signals",
+    "activate_signal",
+    "sync_creatives",
+    "get_properties",
+    "get_channels",
+    "get_epg_shows",
+    "get_adbreaks",
+    "get_inventory",
+    "book_ad",
+})
+_BATCH_LIMIT = 20
+
+
+def _registered_tool(name: str):
+    """
+    The FastMCP Tool registered under `name`, or None.
+    Tool.run validates arguments exactly like a direct call and returns the
+    raw result. FastMCP has no public accessor for it, so this is the one
+    place that reads the private _tool_manager (mcp 1.20 through 1.x).
+    """
+    return mcp._tool_manager.get_tool(name)
+
+
+@mcp.tool(
+    "adcp_batch",
+    description=f"⚡ ADCP: Run up to {_BATCH_LIMIT} ADCP tool calls concurrently. Example: [{{'tool': 'get_products', 'args': {{'query': 'prime time sports'}}}}, {{'tool': 'get_properties', 'args': {{}}}}]"
+)
+async def adcp_batch(calls: List[Dict]) -> list:
+    """
+    Execute independent tool calls concurrently instead of one after another.
+    Each call goes through the registered tool, so its arguments are
+    validated exactly as for a direct call.
+    
+    Args:
+        calls (list): Entries of the form {"tool": <tool name>, "args": {...}}
+    
+    Returns:
+        One result per call, in the same order as `calls`
+    
+    Raises:
+        ValueError: If `calls` has more than _BATCH_LIMIT entries
+    """
+    if len(calls) > _BATCH_LIMIT:
+        raise ValueError(f"Too many calls: {len(calls)} (limit {_BATCH_LIMIT})")
+
+    async def run(call: Dict):
+        name = call.get("tool")
+        tool = _registered_tool(name) if name in _BATCH_TOOLS else None
+        if tool is None:
+            return {"error": f"Unknown tool: {name}"}
+        return await tool.run(call.get("args") or {})
+
+    results = await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+    return [{"error": str(r)} if isinstance(r, BaseException) else r for r in results]
 
 
 # ==============================================
@@ -487,6 +499,7 @@ Task-first architecture for advertising automation:
 - Signals Activation: discover_signals, activate_signal
 - Creative Protocol: sync_creatives
 - Property Discovery: get_properties
+- Batch Execution: adcp_batch
 
 Natural language queries supported across all discovery tasks."""
 
@@ -0,0 +1,44 @@
+import functools
+
+import httpx
+import pytest
+
+import adcp_client
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """
+    Route adcp_client through an httpx.MockTransport and an in-memory Redis.
+    Set `backend.handler` to answer requests; `backend.hits` counts them.
+    """
+    class Backend:
+        hits = 0
+        handler = None
+        redis = {}
+
+    async def handle(request):
+        Backend.hits += 1
+        return await Backend.handler(request)
+
+    async def redis_load(key):
+        return Backend.redis.get(key)
+
+    async def redis_store(key, body):
+        Backend.redis[key] = body
+        Backend.redis[f"{key}:stale"] = body
+
+    # Keep adcp_client's own client settings, swapping only the transport
+    client_cls = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(httpx, "AsyncClient", client_cls)
+    monkeypatch.setattr(adcp_client, "_CLIENT", None)
+    monkeypatch.setattr(adcp_client, "_API_CLIENT", None)
+    monkeypatch.setattr(adcp_client, "_register_shutdown", lambda: None)
+    monkeypatch.setattr(adcp_client, "_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(adcp_client, "_redis_load", redis_load)
+    monkeypatch.setattr(adcp_client, "_redis_store", redis_store)
+    adcp_client._CHANNELS_CACHE.clear()
+    adcp_client._EPG_CACHE.clear()
+    yield Backend
+    adcp_client._CHANNELS_CACHE.clear()
+    adcp_client._EPG_CACHE.clear()
@@ -0,0 +1,180 @@
+import asyncio
+
+import httpx
+
+import adcp_client
+
+
+def test_concurrent_misses_share_one_backend_call(backend):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"channels": ["al_aoula"]})
+    backend.handler = handler
+
+    async def main():
+        return await asyncio.gather(*(adcp_client.get_channels_impl() for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert backend.hits == 1
+    assert all(r == {"channels": ["al_aoula"]} for r in results)
+
+
+def test_error_results_are_not_cached(backend):
+    responses = iter([httpx.Response(404), httpx.Response(200, json={"channels": []})])
+
+    async def handler(request):
+        return next(responses)
+    backend.handler = handler
+
+    first = asyncio.run(adcp_client.get_channels_impl())
+    second = asyncio.run(adcp_client.get_channels_impl())
+    assert "error" in first
+    assert second == {"channels": []}
+    assert backend.hits == 2
+
+
+def test_503_is_retried(backend):
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"ok": True})])
+
+    async def handler(request):
+        return next(responses)
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.call_backend("GET", "/api/v1/flaky"))
+    assert result == {"ok": True}
+    assert backend.hits == 2
+
+
+def test_transport_failure_serves_stale_entry(backend):
+    async def handler(request):
+        return httpx.Response(200, json={"products": [1, 2]})
+    backend.handler = handler
+
+    path = adcp_client.PATHS["products"]
+    fresh = asyncio.run(adcp_client.call_backend("GET", path, stale_cache=True))
+    assert fresh == {"products": [1, 2]}
+
+    # Fresh entry expired, backend now down
+    backend.redis = {k: v for k, v in backend.redis.items() if k.endswith(":stale")}
+
+    async def down(request):
+        raise httpx.ConnectError("connection refused", request=request)
+    backend.handler = down
+
+    result = asyncio.run(adcp_client.call_backend("GET", path, stale_cache=True))
+    assert result == {"products": [1, 2], "cached": True, "stale": True}
+
+
+def test_redirects_are_followed(backend):
+    async def handler(request):
+        if request.url.path.endswith("/old"):
+            return httpx.Response(301, headers={"Location": "/api/v1/new"})
+        return httpx.Response(200, json={"path": request.url.path})
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.call_backend("GET", "/api/v1/old"))
+    assert result == {"path": "/api/v1/new"}
+
+    result = asyncio.run(adcp_client.get_api_data_impl("http://example.com/api/v1/old"))
+    assert result == {"path": "/api/v1/new"}
+
+
+def test_oversized_body_is_refused(backend, monkeypatch):
+    monkeypatch.setattr(adcp_client, "_MAX_BODY_BYTES", 64)
+
+    async def handler(request):
+        return httpx.Response(200, json={"products": list(range(100))})
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.call_backend("POST", adcp_client.PATHS["products"], json={}))
+    assert result == {"error": "response body over 64 bytes"}
+
+
+def test_default_epg_date_rolls_over_at_midnight(backend, monkeypatch):
+    async def handler(request):
+        return httpx.Response(200, json={"date": request.url.params["date"]})
+    backend.handler = handler
+
+    monkeypatch.setattr(adcp_client, "today_iso", lambda: "2025-01-01")
+    assert asyncio.run(adcp_client.get_epg_shows_impl("al_aoula")) == {"date": "2025-01-01"}
+    monkeypatch.setattr(adcp_client, "today_iso", lambda: "2025-01-02")
+    assert asyncio.run(adcp_client.get_epg_shows_impl("al_aoula")) == {"date": "2025-01-02"}
+    assert backend.hits == 2
+
+
+def test_api_data_failures_do_not_blame_backend(backend):
+    async def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.get_api_data_impl("http://example.com/"))
+    assert result == {"error": "host unreachable"}
+
+
+def test_post_is_not_retried_after_reaching_backend(backend):
+    async def timeout(request):
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    async def bad_gateway(request):
+        return httpx.Response(502)
+
+    for handler in (timeout, bad_gateway):
+        backend.handler = handler
+        backend.hits = 0
+        result = asyncio.run(adcp_client.call_backend("POST", adcp_client.PATHS["media_buy"], json={}))
+        assert "error" in result
+        assert backend.hits == 1
+
+
+def test_post_is_retried_when_refused(backend):
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"ok": True})])
+
+    async def handler(request):
+        return next(responses)
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.call_backend("POST", adcp_client.PATHS["media_buy"], json={}))
+    assert result == {"ok": True}
+    assert backend.hits == 2
+
+
+def test_retry_after_is_capped():
+    response = httpx.Response(429, headers={"Retry-After": "3600"})
+    assert adcp_client._retry_delay(0, response) == adcp_client._RETRY_MAX_DELAY
+    response = httpx.Response(429, headers={"Retry-After": "1"})
+    assert adcp_client._retry_delay(0, response) == 1.0
+
+
+def test_client_error_does_not_serve_stale_entry(backend):
+    async def handler(request):
+        return httpx.Response(200, json={"products": [1, 2]})
+    backend.handler = handler
+
+    path = adcp_client.PATHS["products"]
+    asyncio.run(adcp_client.call_backend("GET", path, stale_cache=True))
+    backend.redis = {k: v for k, v in backend.redis.items() if k.endswith(":stale")}
+
+    async def not_found(request):
+        return httpx.Response(404)
+    backend.handler = not_found
+
+    result = asyncio.run(adcp_client.call_backend("GET", path, stale_cache=True))
+    assert result == {"error": "status 404"}
+
+
+def test_cap_list_truncates_catalog(backend):
+    async def handler(request):
+        return httpx.Response(200, json={"status": "ok", "products": list(range(500))})
+    backend.handler = handler
+
+    result = asyncio.run(adcp_client.call_backend("POST", adcp_client.PATHS["products"], json={}, cap_list="products"))
+    assert result["products"] == list(range(adcp_client._CAP_LIMIT))
+    assert result["truncated"] is True
+    assert result["status"] == "ok"
+
+    async def small(request):
+        return httpx.Response(200, json={"products": [1, 2]})
+    backend.handler = small
+
+    result = asyncio.run(adcp_client.call_backend("POST", adcp_client.PATHS["products"], json={}, cap_list="products"))
+    assert result == {"products": [1, 2]}
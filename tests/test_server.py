@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import server
+
+
+def test_create_media_buy_wire_format(backend):
+    sent = []
+
+    async def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={"status": "ok"})
+    backend.handler = handler
+
+    result = asyncio.run(server.create_media_buy(
+        name="Spring Sale",
+        advertiser="Acme",
+        package_ids=["p1", "p2"],
+        start_date="2025-01-01",
+        end_date="2025-01-31",
+        budget=10000.0,
+    ))
+    assert result == {"status": "ok"}
+
+    # Same bytes as the dict payload the tool used to build
+    expected = {
+        "name": "Spring Sale",
+        "advertiser": "Acme",
+        "packages": [{"package_id": "p1"}, {"package_id": "p2"}],
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-31",
+        "budget": 10000.0,
+        "currency": "MAD",
+        "objectives": ["reach", "awareness"],
+        "kpis": {},
+    }
+    assert sent[0].content == orjson.dumps(expected)
+    assert sent[0].headers["Content-Type"] == "application/json"
+
+
+def test_adcp_batch_keeps_call_order(backend):
+    async def handler(request):
+        channel = request.url.params.get("channel")
+        # The first call answers last
+        await asyncio.sleep(0.05 if channel == "al_aoula" else 0)
+        return httpx.Response(200, json={"path": request.url.path, "channel": channel})
+    backend.handler = handler
+
+    results = asyncio.run(server.adcp_batch([
+        {"tool": "get_epg_shows", "args": {"channel": "al_aoula", "query_date": "2025-01-01"}},
+        {"tool": "nope"},
+        {"tool": "get_channels"},
+        {"tool": "adcp_batch", "args": {"calls": []}},
+    ]))
+    assert results == [
+        {"path": "/api/v1/programs", "channel": "al_aoula"},
+        {"error": "Unknown tool: nope"},
+        {"path": "/api/v1/channels", "channel": None},
+        {"error": "Unknown tool: adcp_batch"},
+    ]
+
+
+def test_adcp_batch_validates_arguments(backend):
+    results = asyncio.run(server.adcp_batch([
+        {"tool": "get_epg_shows", "args": {"bogus": 1}},
+    ]))
+    assert "validation error" in results[0]["error"]
+    assert backend.hits == 0
+
+
+def test_adcp_batch_rejects_oversized_batch(backend):
+    with pytest.raises(ValueError):
+        asyncio.run(server.adcp_batch([{"tool": "get_channels"}] * (server._BATCH_LIMIT + 1)))